@@ -1,13 +1,37 @@
 import os
+import codecs
 import json
-import re
+import string
+import mmap
+import concurrent.futures
 from pathlib import Path
 from typing import Any
+import requests
 import yaml  # Requires PyYAML package (pip install pyyaml)
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 from json_repair import repair_json
 from datetime import datetime
+import time
+import threading
+
+try:
+    # Optional: orjson parses large responses several times faster than json
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    # libyaml's C emitter is much faster than the pure-Python one for long texts
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+
+try:
+    # Only used to recognise transport errors if the SDK sends requests with httpx
+    import httpx
+except ImportError:
+    httpx = None
 
 SYSTEM_PROMPT = """
 You are a precise JSON formatter tasked with extracting structured patent information. Convert Google Patents webpage text into well-formatted JSON while following these rules for accuracy and consistency.
@@ -371,139 +395,213 @@ COMMON ERRORS TO AVOID:
 - Mixing data types (string vs. number)
 """
 
+MODEL = "gemini-2.0-flash-thinking-exp-01-21"
 
-def fix_json_string(json_str: str) -> str:
-    """Attempt to fix common JSON formatting issues.
+# The experimental thinking models have no JSON mode and reject
+# response_mime_type="application/json" with 400 INVALID_ARGUMENT
+JSON_MODE = "thinking" not in MODEL
 
-    :param json_str: The potentially malformed JSON string
-    :return: A hopefully corrected JSON string
+# Inputs larger than this are truncated before being sent to Gemini (~200k tokens)
+MAX_INPUT_BYTES = 800_000
+
+# Number of retries that send the parse error back to the model instead of
+# re-sending the original prompt from scratch
+MAX_FEEDBACK_RETRIES = 2
+
+
+class ResponseParseError(ValueError):
+    """Raised when a model response cannot be parsed into a JSON object.
+
+    :param message: Error message for the log
+    :param detail: Description of what was wrong with the JSON, sent back to the
+        model when retrying with feedback
     """
-    # Find the JSON part - sometimes the model outputs text before/after the JSON
-    json_match = re.search(r"({[\s\S]*})", json_str)
-    if json_match:
-        json_str = json_match.group(1)
 
-    # Fix missing quotes around keys
-    json_str = re.sub(r"([{,])\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:", r'\1"\2":', json_str)
+    def __init__(self, message: str, detail: str = ""):
+        super().__init__(message)
+        self.detail = detail
 
-    # Fix single quotes to double quotes (but be careful with nested quotes)
-    json_str = re.sub(r"(?<=[,{[\s])\'([^\']*?)\'(?=[,}\]:])", r'"\1"', json_str)
 
-    # Fix trailing commas in arrays/objects
-    json_str = re.sub(r",\s*([}\]])", r"\1", json_str)
+# HTTP status codes of Gemini client errors that are worth retrying
+_RETRYABLE_STATUS_CODES = {408, 429}
 
-    # Fix the common "potential_limitations": "value": "description" error pattern
-    json_str = re.sub(
-        r'"potential_limitations":\s*"[^"]*":\s*"([^"]*)"',
-        r'"potential_limitations": "\1"',
-        json_str,
-    )
+# Network failures; the SDK sends its requests through requests (httpx in newer versions)
+_TRANSIENT_ERRORS = (
+    errors.ServerError,
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+if httpx is not None:
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Check whether an error from a Gemini request is transient.
+
+    Server errors, network failures, timeouts and rate limits are retried;
+    any other failure gives up on the file right away.
+
+    :param error: The exception raised while processing a file
+    :return: True if the request may succeed when retried
+    """
+    if isinstance(error, errors.ClientError):
+        return error.code in _RETRYABLE_STATUS_CODES
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return True
+    return False
+
+
+_client: genai.Client | None = None
+_client_lock = threading.Lock()
 
-    # Fix any field with a format like "key": "value": "description"
-    pattern = r'"([^"]+)":\s*"[^"]*":\s*"([^"]*)"'
-    while re.search(pattern, json_str):
-        json_str = re.sub(pattern, r'"\1": "\2"', json_str)
 
-    # Fix unescaped quotes in string values
-    # First, identify string values
-    def fix_inner_quotes(match):
-        value = match.group(1)
-        # Replace unescaped quotes that aren't at the beginning/end
-        if '"' in value[1:-1]:
-            value = value[0] + value[1:-1].replace('"', '\\"') + value[-1]
-        return value
+def _get_client() -> genai.Client:
+    """Return a Gemini client shared by all requests in this process.
+
+    :return: Gemini API client
+    """
+    global _client
 
-    json_str = re.sub(r'("(?:[^"\\]|\\.)*")', fix_inner_quotes, json_str)
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-    return json_str
+    with _client_lock:
+        if _client is None:
+            _client = genai.Client(api_key=api_key)
+        return _client
 
 
-def parse_json_safely(json_str: str) -> dict[str, Any] | None:
+def parse_json_safely(
+    json_str: str, source: str | Path | None = None
+) -> dict[str, Any] | None:
     """Parse JSON with minimal processing - only repair if necessary.
 
     :param json_str: JSON string to parse
-    :return: Parsed dictionary or None if parsing fails
+    :param source: Input file the JSON was generated from; its name is included
+        in the debug log file names so concurrent failures don't collide
+    :return: Parsed dictionary; if parsing fails, a dictionary with the raw
+        response under "raw_response" and the parse error under "parse_error"
     """
     # Remove markdown code block formatting if present
-    json_str = re.sub(r"^```json\s*", "", json_str)
-    json_str = re.sub(r"\s*```$", "", json_str)
+    json_str = json_str.strip()
+    if json_str.startswith("```"):
+        # Drop the fence and its language tag (e.g. "json"), keeping the rest of the line
+        json_str = json_str[3:].lstrip(string.ascii_letters)
+        json_str = json_str.rstrip().removesuffix("```").strip()
 
     # Store original for debugging
     original_json_str = json_str
-    
+
+    # Drop any text the model put before the first "{" or after the last "}"
+    start = json_str.find("{")
+    end = json_str.rfind("}")
+    if start != -1 and end > start:
+        json_str = json_str[start : end + 1]
+
+    # First attempt: try standard JSON parsing without any repair
+    try:
+        return json_loads(json_str)
+    except json.JSONDecodeError as e:
+        decode_error = e
+
+    parse_error = f"{decode_error.msg} at line {decode_error.lineno}, column {decode_error.colno}"
+    error_msg = f"Standard JSON parsing failed: {decode_error}\nError at line {decode_error.lineno}, column {decode_error.colno}: {decode_error.msg}"
+    print(error_msg)
+
     # Create a log directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True, parents=True)
     
-    # Create log file for parsing errors
-    error_log = log_dir / f"json_parsing_errors_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+    # Create log file for parsing errors, one per input file
+    prefix = f"{Path(source).stem}_" if source is not None else ""
+    error_log = log_dir / f"json_parsing_errors_{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 
     with open(error_log, "a", encoding="utf-8") as log_file:
-        # First attempt: try standard JSON parsing without any repair
+        # Log the error details
+        log_file.write(f"=== JSON PARSING ERROR ===\n")
+        log_file.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        log_file.write(f"Error: {decode_error}\n")
+        log_file.write(f"Line: {decode_error.lineno}, Column: {decode_error.colno}\n")
+        log_file.write(f"Error message: {decode_error.msg}\n\n")
+        
+        # Log the problematic context
+        lines = json_str.splitlines()
+        if 0 <= decode_error.lineno - 1 < len(lines):
+            error_line = lines[decode_error.lineno - 1]
+            log_file.write(f"Error line content: {error_line}\n")
+            # Mark the error position
+            pointer = ' ' * (decode_error.colno - 1) + '^'
+            log_file.write(f"Error position: {pointer}\n\n")
+        
+        # Try repair
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            error_msg = f"Standard JSON parsing failed: {e}\nError at line {e.lineno}, column {e.colno}: {e.msg}"
+            # Fall back to json_repair only if standard parsing fails
+            log_file.write("Attempting repair with json_repair...\n")
+            result = repair_json(json_str, return_objects=True, ensure_ascii=False)
+            if not isinstance(result, dict):
+                raise ValueError(
+                    f"repair produced {type(result).__name__} instead of an object"
+                )
+            log_file.write("Repair successful!\n\n")
+            return result
+        except Exception as repair_e:
+            parse_error += f"; {repair_e}"
+            error_msg = f"Error repairing JSON: {str(repair_e)}"
             print(error_msg)
             
-            # Log the error details
-            log_file.write(f"=== JSON PARSING ERROR ===\n")
-            log_file.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            log_file.write(f"Error: {e}\n")
-            log_file.write(f"Line: {e.lineno}, Column: {e.colno}\n")
-            log_file.write(f"Error message: {e.msg}\n\n")
+            # Log repair error
+            log_file.write(f"Repair failed: {repair_e}\n\n")
             
-            # Log the problematic context
-            if 0 <= e.lineno - 1 < len(json_str.splitlines()):
-                error_line = json_str.splitlines()[e.lineno - 1]
-                log_file.write(f"Error line content: {error_line}\n")
-                # Mark the error position
-                pointer = ' ' * (e.colno - 1) + '^'
-                log_file.write(f"Error position: {pointer}\n\n")
+            # Save the problematic JSON for debugging
+            debug_file = log_dir / f"problematic_json_{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+            with open(debug_file, "w", encoding="utf-8") as f:
+                f.write(original_json_str)
             
-            # Try repair
-            try:
-                # Fall back to json_repair only if standard parsing fails
-                log_file.write("Attempting repair with json_repair...\n")
-                result = repair_json(json_str, return_objects=True, ensure_ascii=False)
-                log_file.write("Repair successful!\n\n")
-                return result
-            except Exception as repair_e:
-                error_msg = f"Error repairing JSON: {str(repair_e)}"
-                print(error_msg)
-                
-                # Log repair error
-                log_file.write(f"Repair failed: {repair_e}\n\n")
-                
-                # Save the problematic JSON for debugging
-                debug_file = log_dir / f"problematic_json_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-                with open(debug_file, "w", encoding="utf-8") as f:
-                    f.write(original_json_str)
-                
-                log_file.write(f"Full JSON saved to: {debug_file}\n")
-                print(f"Saved problematic JSON to {debug_file}")
-                
-                # Return a dict with the raw response to preserve everything
-                return {"raw_response": original_json_str}
+            log_file.write(f"Full JSON saved to: {debug_file}\n")
+            print(f"Saved problematic JSON to {debug_file}")
+            
+            # Return a dict with the raw response to preserve everything
+            return {"raw_response": original_json_str, "parse_error": parse_error}
 
 
-def generate(input_file_path: str | Path) -> dict[str, Any]:
-    """Process the entire text from a file using Gemini API and return result as a dictionary.
+def _call_llm(
+    input_file_path: str | Path,
+    prior_attempt: tuple[str, str] | None = None,
+    verbose: bool = False,
+) -> str:
+    """Send the text of a file to the Gemini API and return the raw response text.
 
     :param input_file_path: Path to the input text file
-    :return: Dictionary containing the parsed JSON response
+    :param prior_attempt: Optional (response, error) of a previous attempt whose
+        output could not be parsed; the model is asked to correct it
+    :param verbose: Stream the response and print a progress indicator per chunk
+    :return: Raw text of the model response
     """
-    # Read input from file
-    with open(input_file_path, "r", encoding="utf-8") as file:
-        input_text = file.read()
-
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY environment variable is not set")
-
-    client = genai.Client(api_key=api_key)
+    # Read input from file, decoding straight from the mapped pages
+    with open(input_file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            input_text = ""  # Empty files cannot be memory-mapped
+        else:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if size > MAX_INPUT_BYTES:
+                    print(
+                        f"Warning: {input_file_path} is {size} bytes, "
+                        f"truncating to {MAX_INPUT_BYTES} bytes"
+                    )
+                    # Decode strictly, but hold back a multi-byte character split
+                    # by the cut instead of failing on it
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+                    input_text = decoder.decode(mm[:MAX_INPUT_BYTES], final=False)
+                else:
+                    input_text = str(mm, "utf-8")
+
+    client = _get_client()
 
-    model = "gemini-2.0-flash-thinking-exp-01-21"
     contents = [
         types.Content(
             role="user",
@@ -512,6 +610,24 @@ def generate(input_file_path: str | Path) -> dict[str, Any]:
             ],
         ),
     ]
+    if prior_attempt is not None:
+        # Retry with feedback: show the model its own output and the parse error
+        previous_response, error = prior_attempt
+        contents += [
+            types.Content(
+                role="model",
+                parts=[types.Part.from_text(text=previous_response)],
+            ),
+            types.Content(
+                role="user",
+                parts=[
+                    types.Part.from_text(
+                        text=f"Your previous JSON had error: {error}. "
+                        "Fix and return corrected JSON only."
+                    ),
+                ],
+            ),
+        ]
     generate_content_config = types.GenerateContentConfig(
         temperature=0.1,
         top_p=0.3,
@@ -523,41 +639,79 @@ def generate(input_file_path: str | Path) -> dict[str, Any]:
                 threshold="OFF",  # Off
             ),
         ],
-        response_mime_type="text/plain",
+        # Constrain decoding to syntactically valid JSON where the model supports it
+        response_mime_type="application/json" if JSON_MODE else "text/plain",
         system_instruction=[
             types.Part.from_text(text=SYSTEM_PROMPT),
         ],
     )
 
+    if not verbose:
+        # The JSON can't be used until it is complete, so fetch it in one go
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=contents,
+            config=generate_content_config,
+        )
+        return response.text or ""
+
     # Collect the full response
-    full_response = ""
+    chunks = []
     for chunk in client.models.generate_content_stream(
-        model=model,
+        model=MODEL,
         contents=contents,
         config=generate_content_config,
     ):
-        full_response += chunk.text
+        chunks.append(chunk.text or "")
         print(".", end="", flush=True)  # Progress indicator
     print()  # Newline after progress indicators
 
+    return "".join(chunks)
+
+
+def _parse_response(full_response: str, input_file_path: str | Path) -> dict[str, Any]:
+    """Parse a raw model response into a dictionary.
+
+    :param full_response: Raw text of the model response
+    :param input_file_path: Path to the input file the response was generated from
+    :return: Dictionary containing the parsed JSON response
+    """
     # Try to parse the JSON response with our robust parser
-    result_dict = parse_json_safely(full_response)
+    result_dict = parse_json_safely(full_response, input_file_path)
 
-    if result_dict is None:
+    if not isinstance(result_dict, dict) or "raw_response" in result_dict:
         # If all parsing attempts fail, save the raw response for debugging
         error_file = Path(input_file_path).stem + "_error_response.txt"
         with open(error_file, "w", encoding="utf-8") as f:
             f.write(full_response)
-        raise ValueError(
-            f"Failed to parse response as JSON. Raw response saved to {error_file}"
+        if isinstance(result_dict, dict):
+            detail = result_dict.get("parse_error", "")
+        else:
+            detail = f"expected a JSON object, got {type(result_dict).__name__}"
+        raise ResponseParseError(
+            f"Failed to parse response as JSON ({detail}). "
+            f"Raw response saved to {error_file}",
+            detail,
         )
 
     return result_dict
 
 
+def generate(input_file_path: str | Path) -> dict[str, Any]:
+    """Process the entire text from a file using Gemini API and return result as a dictionary.
+
+    :param input_file_path: Path to the input text file
+    :return: Dictionary containing the parsed JSON response
+    """
+    return _parse_response(_call_llm(input_file_path), input_file_path)
+
+
 def save_as_yaml(data: dict[str, Any], output_file_path: str | Path) -> None:
     """Save dictionary data as YAML file.
 
+    The file is written to a temporary sibling and renamed into place, so an
+    interrupted run never leaves a truncated file that later runs would skip.
+
     :param data: Dictionary containing the data to save
     :param output_file_path: Path to save the YAML file
     """
@@ -565,21 +719,53 @@ def save_as_yaml(data: dict[str, Any], output_file_path: str | Path) -> None:
     output_path = Path(output_file_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w", encoding="utf-8") as file:
-        yaml.dump(data, file, default_flow_style=False, sort_keys=False)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            yaml.dump(
+                data,
+                file,
+                Dumper=YamlDumper,
+                default_flow_style=False,
+                sort_keys=False,
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _postprocess(
+    full_response: str, input_file_path: str | Path, output_file_path: str | Path
+) -> None:
+    """Parse a raw model response and save it as YAML.
+
+    :param full_response: Raw text of the model response
+    :param input_file_path: Path to the input file the response was generated from
+    :param output_file_path: Path to save the YAML file
+    """
+    save_as_yaml(_parse_response(full_response, input_file_path), output_file_path)
 
 
 def process_file_with_retry(
-    input_file: Path, output_dir: Path, max_retries: int = 3
+    input_file: Path,
+    output_dir: Path,
+    max_retries: int = 3,
+    verbose: bool = False,
 ) -> bool:
     """Process a single file with retry logic.
 
     :param input_file: Path to the input text file
     :param output_dir: Directory to save the output
     :param max_retries: Maximum number of retry attempts
+    :param verbose: Stream the Gemini response with a progress indicator
     :return: True if processing succeeded, False otherwise
     """
     retries = 0
+    feedback_retries = 0
+    prior_attempt = None
     output_file = output_dir / f"{input_file.stem}.yaml"
 
     # Skip if output already exists (comment out this section if you want to reprocess)
@@ -590,32 +776,66 @@ def process_file_with_retry(
     while retries < max_retries:
         try:
             print(f"Processing {input_file} (attempt {retries + 1}/{max_retries})...")
-            patent_data = generate(input_file)
+            full_response = _call_llm(input_file, prior_attempt, verbose)
 
-            # Save result
-            save_as_yaml(patent_data, output_file)
+            # Parse and save result; this is quick next to the Gemini call itself
+            _postprocess(full_response, input_file, output_file)
 
             print(f"Successfully processed {input_file}")
             print(f"Result saved to {output_file}")
             return True
 
+        except ResponseParseError as e:
+            retries += 1
+            print(f"Error processing {input_file}: {e}")
+
+            # Feed the malformed output back to the model rather than starting over
+            if feedback_retries < MAX_FEEDBACK_RETRIES:
+                feedback_retries += 1
+                prior_attempt = (full_response, e.detail or str(e))
+            else:
+                prior_attempt = None
+
+            # Not rate-limit related, so retry straight away
+            if retries < max_retries:
+                print(f"Retrying with feedback... (attempt {retries + 1}/{max_retries})")
+            else:
+                print(f"Failed to process {input_file} after {max_retries} attempts")
+                return False
+
         except Exception as e:
             retries += 1
             print(f"Error processing {input_file}: {e}")
 
+            # Bad API keys, permission errors and invalid requests won't fix themselves
+            if not _is_retryable(e):
+                print(f"Failed to process {input_file}: error is not retryable")
+                return False
+
             if retries < max_retries:
-                print(f"Retrying immediately... (attempt {retries + 1}/{max_retries})")
-                # No sleep/wait time here - retry immediately
+                print(f"Retrying... (attempt {retries + 1}/{max_retries})")
+                time.sleep(1.0 * retries)
             else:
                 print(f"Failed to process {input_file} after {max_retries} attempts")
                 return False
 
 
-def batch_process_folder(input_dir: str | Path, max_retries: int = 3) -> list[Path]:
+def batch_process_folder(
+    input_dir: str | Path,
+    max_retries: int = 3,
+    max_workers: int = 4,
+    verbose: bool = False,
+) -> list[Path]:
     """Process all text files in a folder.
 
+    Files are processed concurrently on a thread pool, since the time is spent
+    waiting on Gemini.
+
     :param input_dir: Directory containing input text files
     :param max_retries: Maximum number of retry attempts per file
+    :param max_workers: Maximum number of concurrent Gemini requests
+    :param verbose: Stream Gemini responses with a progress indicator; only
+        applies when max_workers is 1, as concurrent indicators would interleave
     :return: List of files that failed to process
     """
     input_path = Path(input_dir)
@@ -625,10 +845,21 @@ def batch_process_folder(input_dir: str | Path, max_retries: int = 3) -> list[Pa
     output_dir = input_path.parent / f"{input_path.name}_results"
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Get all text files in the directory
-    text_files = [
-        f for f in input_path.iterdir() if f.is_file() and f.suffix.lower() in [".md"]
-    ]
+    # Get all text files in the directory; DirEntry caches its stat() result
+    text_files = []
+    empty_count = 0
+    with os.scandir(input_path) as entries:
+        for entry in entries:
+            if not (entry.name.lower().endswith(".md") and entry.is_file()):
+                continue
+            # Skip empty files rather than spending a Gemini request on them
+            if entry.stat().st_size == 0:
+                empty_count += 1
+            else:
+                text_files.append(Path(entry.path))
+
+    if empty_count:
+        print(f"Skipping {empty_count} empty files")
 
     if not text_files:
         print(f"No text files found in {input_dir}")
@@ -636,13 +867,23 @@ def batch_process_folder(input_dir: str | Path, max_retries: int = 3) -> list[Pa
 
     print(f"Found {len(text_files)} text files to process")
 
-    failed_files = []
-    for idx, file in enumerate(text_files, 1):
-        print(f"\nProcessing file {idx}/{len(text_files)}: {file.name}")
-        success = process_file_with_retry(file, output_dir, max_retries)
+    # Progress dots from several threads at once would be meaningless
+    stream = verbose and max_workers == 1
 
-        if not success:
-            failed_files.append(file)
+    failed_files = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                process_file_with_retry, file, output_dir, max_retries, stream
+            ): file
+            for file in text_files
+        }
+        for idx, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            file = futures[future]
+            print(f"\nFinished file {idx}/{len(text_files)}: {file.name}")
+
+            if not future.result():
+                failed_files.append(file)
 
     # Summary
     total = len(text_files)
@@ -671,6 +912,18 @@ if __name__ == "__main__":
     parser.add_argument(
         "--retries", type=int, default=3, help="Maximum retry attempts for each file"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent Gemini requests (default: 4)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Stream Gemini responses and show a progress indicator "
+        "(single file or --workers 1 only)",
+    )
 
     args = parser.parse_args()
 
@@ -686,18 +939,24 @@ if __name__ == "__main__":
     try:
         if args.folder:
             # Process folder
-            batch_process_folder(args.folder, args.retries)
+            batch_process_folder(
+                args.folder, args.retries, args.workers, args.verbose
+            )
         elif args.file:
             # Process single file
             input_file = Path(args.file)
             output_dir = input_file.parent / f"{input_file.parent.name}_results"
             output_dir.mkdir(exist_ok=True)
-            process_file_with_retry(input_file, output_dir, args.retries)
+            process_file_with_retry(
+                input_file, output_dir, args.retries, verbose=args.verbose
+            )
         else:
             # Default folder
             default_folder = Path("patent_data/text/raw")
             if default_folder.exists() and default_folder.is_dir():
-                batch_process_folder(default_folder, args.retries)
+                batch_process_folder(
+                    default_folder, args.retries, args.workers, args.verbose
+                )
             else:
                 print(
                     "Error: No input folder or file specified and default folder not found"
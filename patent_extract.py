@@ -1,21 +1,90 @@
 import re
 from dataclasses import dataclass, field
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import os
-from markdownify import markdownify as md
+from markdownify import MarkdownConverter
 from pathlib import Path
 import pandas as pd
 from tqdm import tqdm
 from tqdm.asyncio import tqdm_asyncio
 from datetime import datetime
 import concurrent.futures
+import multiprocessing
+import threading
+from functools import partial
+import gzip
+import mmap
 import time
+import traceback
+import zlib
 
+try:
+    import lxml  # noqa: F401
 
-@dataclass
+    # The C-based lxml parser is several times faster than Python's html.parser
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+# Browser-like headers sent with every patent page request
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+}
+
+# Include full tracebacks in per-patent error messages (set by --debug)
+INCLUDE_TRACEBACKS = False
+
+# Per-thread requests sessions, so worker threads reuse their connections
+_thread_local = threading.local()
+
+# Output directories already created by this process
+_CREATED_DIRS: set[str] = set()
+
+# Start method for conversion pools. Workers are started from fetch threads, and
+# forking a process with other threads mid-request can deadlock the child, so
+# use a fresh interpreter (forkserver, or spawn where that is unavailable)
+_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Characters that are not allowed in file names
+_FILENAME_RE = re.compile(r'[\\/*?:"<>|]')
+
+# Header/body separator line of a markdown table, e.g. "| --- | :---: |"
+_TABLE_DELIMITER_RE = re.compile(r"\s*\|[\s|:-]*-[\s|:-]*\|\s*")
+
+# Relative Google Patents citation links, e.g. [US1234567A (en)](/patent/US1234567A/en)
+_PATENT_LINK_RE = re.compile(
+    r"\[([A-Z]{2}\d+[A-Z0-9]*)\s+\((\w+)\)\]\(/patent/([A-Z0-9]+)/(\w+)\)"
+)
+
+_EXCESS_NEWLINES_RE = re.compile(r"\n{4,}")
+_NOISE_RE = re.compile(r"0\.000(?:description\d+|\w+\d+)")
+
+# Only the elements extract_data reads, so metadata-only parses skip the rest of the page
+_META_STRAINER = SoupStrainer(attrs={"itemprop": ["publicationNumber", "title"]})
+
+SECTION_HEADERS = [
+    "Abstract",
+    "Claims",
+    "Description",
+    "Legal Events",
+    "Classifications",
+    "Citations",
+]
+_SECTION_HEADER_RE = re.compile(f"## ({'|'.join(SECTION_HEADERS)})\\n")
+
+
+@dataclass(slots=True)
 class PatentClaim:
     """Data class for patent claims with number, text and dependency information."""
 
@@ -24,7 +93,7 @@ class PatentClaim:
     dependent_on: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PatentData:
     """Data class for storing basic patent information."""
 
@@ -48,7 +117,7 @@ def clean_filename(name: str) -> str:
     :param name: String to convert to filename
     :return: Safe filename string
     """
-    return re.sub(r'[\\/*?:"<>|]', "", name.replace(" ", "_"))
+    return _FILENAME_RE.sub("", name.replace(" ", "_"))
 
 
 def keep_only_ascii(text: str) -> str:
@@ -63,8 +132,41 @@ def keep_only_ascii(text: str) -> str:
     """
     if not text:
         return ""
-    # Keep only ASCII characters (codes 0-127)
-    return "".join(char for char in text if ord(char) < 128)
+    # isascii() is a flag check, so clean text is returned without a copy
+    if text.isascii():
+        return text
+    # Keep only ASCII characters (codes 0-127); the codec drops the rest in C
+    return text.encode("ascii", errors="ignore").decode("ascii")
+
+
+def get_session() -> requests.Session:
+    """
+    Get the requests session of the current thread, creating it on first use.
+
+    Reusing one session per thread keeps connections to the patent site open
+    between requests instead of doing a new TCP/TLS handshake for every page.
+
+    Returns:
+        requests.Session with browser-like headers and retrying adapters
+    """
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            # main() sets DEFAULT_RETRIES from --retry
+            max_retries=Retry(
+                total=requests.adapters.DEFAULT_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _thread_local.session = session
+    return session
 
 
 def get_html(input_source: str, is_url: bool, session=None) -> str:
@@ -74,7 +176,8 @@ def get_html(input_source: str, is_url: bool, session=None) -> str:
     Args:
         input_source: URL or file path
         is_url: Boolean indicating if input is a URL
-        session: Optional requests session for connection pooling
+        session: Optional requests session; defaults to the current thread's
+            shared session so connections are reused between calls
 
     Returns:
         HTML content as string
@@ -86,17 +189,15 @@ def get_html(input_source: str, is_url: bool, session=None) -> str:
     """
     try:
         if is_url:
-            if session:
-                response = session.get(input_source, timeout=30)
-            else:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Connection": "keep-alive",
-                }
-                response = requests.get(input_source, timeout=30, headers=headers)
+            if session is None:
+                session = get_session()
+            response = session.get(input_source, timeout=30)
             response.raise_for_status()
+            # Patent pages are UTF-8; without a declared charset, requests falls
+            # back to ISO-8859-1 for text/* (or runs charset detection when there
+            # is no Content-Type at all), garbling non-ASCII text
+            if "charset" not in response.headers.get("content-type", "").lower():
+                response.encoding = "utf-8"
             return response.text
         else:
             with open(input_source, "r", encoding="utf-8") as f:
@@ -129,18 +230,22 @@ def extract_text(soup: BeautifulSoup, itemprop: str) -> str:
     return text
 
 
-def extract_data(html_content: str) -> PatentData:
+def extract_data(
+    html_content: str | None = None, soup: BeautifulSoup | None = None
+) -> PatentData:
     """
     Extract basic patent metadata (simplified version).
 
     Args:
         html_content: HTML content of the patent document
+        soup: Already parsed document; when given, html_content is not parsed again
 
     Returns:
         PatentData object containing basic extracted information
     """
-    # Parse HTML
-    soup = BeautifulSoup(html_content, "html.parser")
+    # Parse HTML, building nodes only for the metadata elements
+    if soup is None:
+        soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=_META_STRAINER)
 
     data = PatentData()
 
@@ -151,12 +256,57 @@ def extract_data(html_content: str) -> PatentData:
     return data
 
 
-def save_html_as_markdown(html_content: str, output_file: str) -> None:
+def _is_table_row(line: str) -> bool:
+    """Check whether a markdown line looks like a table row: | cell | cell |"""
+    line = line.strip()
+    return len(line) > 1 and line[0] == "|" and line[-1] == "|"
+
+
+def pad_markdown_tables(markdown_text: str) -> str:
+    """
+    Add blank lines before and after every markdown table.
+
+    Tables are found with a single pass over the lines (a row followed by a
+    "|---|---|" delimiter line, then any further rows), which stays linear on
+    documents with many "|" characters where a regex would backtrack.
+
+    :param markdown_text: Markdown text
+    :return: Markdown text with tables separated from surrounding text
+    """
+    lines = markdown_text.split("\n")
+    output = []
+    i = 0
+    while i < len(lines):
+        if (
+            i + 1 < len(lines)
+            and _is_table_row(lines[i])
+            and _TABLE_DELIMITER_RE.fullmatch(lines[i + 1])
+        ):
+            # Consume the header, delimiter and all following rows
+            end = i + 2
+            while end < len(lines) and _is_table_row(lines[end]):
+                end += 1
+            output += ["", ""]
+            output += lines[i:end]
+            output += ["", ""]
+            i = end
+        else:
+            output.append(lines[i])
+            i += 1
+    return "\n".join(output)
+
+
+def save_html_as_markdown(
+    html_content: str, output_file: str, soup: BeautifulSoup | None = None
+) -> PatentData:
     """
     Save HTML content as a Markdown file using markdownify with improved formatting.
 
     :param html_content: HTML content as a string
     :param output_file: Path to the output file
+    :param soup: Already parsed document to reuse instead of parsing html_content;
+        it is modified in place
+    :return: PatentData with the patent number and title used for the heading
     """
     # Change file extension to .md if it's not already
     if not output_file.endswith(".md"):
@@ -164,18 +314,20 @@ def save_html_as_markdown(html_content: str, output_file: str) -> None:
 
     # Create the directory if it doesn't exist
     output_dir = os.path.dirname(output_file)
-    if output_dir:
+    if output_dir and output_dir not in _CREATED_DIRS:
         os.makedirs(output_dir, exist_ok=True)
+        _CREATED_DIRS.add(output_dir)
 
-    # Create a BeautifulSoup object - use lxml for better performance
-    soup = BeautifulSoup(html_content, "html.parser")
+    # Create a BeautifulSoup object - uses lxml when installed for better performance
+    if soup is None:
+        soup = BeautifulSoup(html_content, HTML_PARSER)
 
     # Remove script and style elements that contain non-visible text
     for element in soup(["script", "style", "noscript", "iframe"]):
         element.decompose()
 
     # Extract patent number and title before conversion for better heading
-    data = extract_data(html_content)
+    data = extract_data(soup=soup)
     patent_number = data.patent_number
     title = data.title
 
@@ -185,136 +337,272 @@ def save_html_as_markdown(html_content: str, output_file: str) -> None:
         # Add a class to indicate this is a table for post-processing
         table["class"] = table.get("class", []) + ["patent-table"]
 
-    # Convert HTML to Markdown with improved settings
-    markdown_text = md(
-        str(soup), heading_style="ATX", strip=["img.patent-image-not-available"]
-    )
+    # Convert the cleaned tree to Markdown directly, rather than serializing it
+    # back to HTML for markdownify to parse a second time
+    markdown_text = MarkdownConverter(
+        heading_style="ATX", strip=["img.patent-image-not-available"]
+    ).convert_soup(soup)
 
     # Clean up markdown - more aggressive cleanup
 
     # Fix tables - make them more readable
-    # Find markdown tables and improve their formatting
-    table_pattern = (
-        r"\|.*\|[\s]*\n\|[\s]*[-]+[\s]*\|[\s]*[-]+[\s]*\|.*\n(\|.*\|[\s]*\n)*"
-    )
-
-    def format_table(match):
-        table_text = match.group(0)
-        # Add extra newline before and after tables
-        return "\n\n" + table_text + "\n\n"
-
-    markdown_text = re.sub(
-        table_pattern, format_table, markdown_text, flags=re.MULTILINE
-    )
+    markdown_text = pad_markdown_tables(markdown_text)
 
     # Improve citation links
-    patent_link_pattern = (
-        r"\[([A-Z]{2}\d+[A-Z0-9]*)\s+\((\w+)\)\]\(/patent/([A-Z0-9]+)/(\w+)\)"
-    )
-    markdown_text = re.sub(
-        patent_link_pattern,
+    markdown_text = _PATENT_LINK_RE.sub(
         r"[\1 (\2)](https://patents.google.com/patent/\3/\4)",
         markdown_text,
     )
 
     # Remove excessive newlines
-    markdown_text = re.sub(r"\n{4,}", "\n\n\n", markdown_text)
+    markdown_text = _EXCESS_NEWLINES_RE.sub("\n\n\n", markdown_text)
 
     # Remove non-ASCII characters
     markdown_text = keep_only_ascii(markdown_text)
 
-    # Remove common noise patterns
-    markdown_text = re.sub(r"0\.000description\d+", "", markdown_text)
-    markdown_text = re.sub(r"0\.000\w+\d+", "", markdown_text)
+    # Remove common noise patterns (all of them start with "0.000")
+    if "0.000" in markdown_text:
+        markdown_text = _NOISE_RE.sub("", markdown_text)
 
     # Improve section headers by adding horizontal rules
-    section_headers = [
-        "Abstract",
-        "Claims",
-        "Description",
-        "Legal Events",
-        "Classifications",
-        "Citations",
-    ]
-    for header in section_headers:
-        pattern = f"## {header}\\n"
-        replacement = f"\n\n---\n\n## {header}\n\n"
-        markdown_text = re.sub(pattern, replacement, markdown_text)
+    markdown_text = _SECTION_HEADER_RE.sub(r"\n\n---\n\n## \1\n\n", markdown_text)
+
+    # Assemble the document with better structure and write it in one go
+    # Create a proper document header
+    parts = [f"# Patent {patent_number}\n\n"]
+
+    if title:
+        parts.append(f"## {title}\n\n")
+
+    # Add a table of contents section
+    parts.append("## Table of Contents\n\n")
 
-    # Write the markdown to file with better structure
-    with open(output_file, "w", encoding="utf-8") as f:
-        # Create a proper document header
-        f.write(f"# Patent {patent_number}\n\n")
+    markdown_lower = markdown_text.lower()
+    for header in SECTION_HEADERS:
+        if header.lower() in markdown_lower:
+            parts.append(f"- [{header}](#{header.lower().replace(' ', '-')})\n")
+    parts.append("\n---\n\n")
 
-        if title:
-            f.write(f"## {title}\n\n")
+    # Add the main content
+    parts.append(markdown_text)
+
+    Path(output_file).write_text("".join(parts), encoding="utf-8")
+
+    return data
+
+
+def patent_id_from_url(url: str) -> str:
+    """
+    Extract the patent ID from a Google Patents URL
+
+    :param url: Patent URL, e.g. https://patents.google.com/patent/US10000000B2/en
+    :return: Patent ID, e.g. US10000000B2
+    """
+    return url.split("/patent/")[-1].split("/")[0]
+
+
+def skip_processed_urls(
+    urls: list[str], output_path: Path, force_reprocess: bool = False
+) -> tuple[list[str], list[PatentData]]:
+    """
+    Split off URLs whose markdown file already exists, so they are never scheduled
+
+    :param urls: Patent URLs to process
+    :param output_path: Output directory containing the markdown folder
+    :param force_reprocess: Keep all URLs even if files already exist
+    :return: Tuple of (URLs still to process, PatentData for the skipped patents)
+    """
+    markdown_dir = output_path / "markdown"
+    markdown_dir.mkdir(exist_ok=True, parents=True)
+
+    if force_reprocess:
+        return urls, []
+
+    # One directory listing instead of an existence check per task
+    done = {md_file.stem for md_file in markdown_dir.glob("*.md")}
+
+    remaining = []
+    skipped = []
+    for url in urls:
+        patent_id = patent_id_from_url(url)
+        if patent_id in done:
+            skipped.append(PatentData(patent_number=patent_id))
+        else:
+            remaining.append(url)
+
+    if skipped:
+        print(f"Skipping {len(skipped)} patents that already have markdown files")
+
+    return remaining, skipped
+
+
+def format_error(url: str, error: Exception) -> str:
+    """
+    Build the error message for a patent that failed to process
+
+    Formatting a traceback is costly, so it is only done when INCLUDE_TRACEBACKS
+    is set; routine failures such as rate-limited fetches just get the message.
+
+    :param url: Patent URL that failed
+    :param error: The exception raised while processing it
+    :return: Error message for the extraction log
+    """
+    message = f"Error processing {url}: {type(error).__name__}: {error}"
+    if INCLUDE_TRACEBACKS:
+        message += "\n" + "".join(traceback.format_exception(error))
+    return message
+
+
+def read_html_cache(cache_file: Path) -> str | None:
+    """
+    Read previously downloaded HTML from the gzip cache
+
+    :param cache_file: Path to the cached .html.gz file
+    :return: Cached HTML, or None if it is missing, empty or unreadable
+    """
+    try:
+        return gzip.decompress(cache_file.read_bytes()).decode("utf-8") or None
+    except (OSError, EOFError, zlib.error, UnicodeDecodeError):
+        return None
+
+
+def write_html_cache(cache_file: Path, html_content: str) -> None:
+    """
+    Store downloaded HTML gzipped so later runs don't need to fetch it again
+
+    :param cache_file: Path to the .html.gz file to write
+    :param html_content: HTML content to cache
+    """
+    cache_dir = str(cache_file.parent)
+    if cache_dir not in _CREATED_DIRS:
+        cache_file.parent.mkdir(exist_ok=True, parents=True)
+        _CREATED_DIRS.add(cache_dir)
+    tmp_file = cache_file.with_suffix(".tmp")
+    tmp_file.write_bytes(gzip.compress(html_content.encode("utf-8")))
+    os.replace(tmp_file, cache_file)
+
+
+def html_to_markdown(html_content: str, output_path: Path) -> PatentData | None:
+    """
+    Parse patent HTML and save it as markdown named after its patent number
+
+    :param html_content: HTML content of the patent page
+    :param output_path: Output directory containing the markdown folder
+    :return: Extracted PatentData, or None if no patent number was found
+    """
+    # Parse once and share the tree with the markdown conversion
+    soup = BeautifulSoup(html_content, HTML_PARSER)
 
-        # Add a table of contents section
-        f.write("## Table of Contents\n\n")
+    # Extract minimal patent data for reporting
+    patent_data = extract_data(soup=soup)
 
-        for header in section_headers:
-            if header.lower() in markdown_text.lower():
-                f.write(f"- [{header}](#{header.lower().replace(' ', '-')})\n")
-        f.write("\n---\n\n")
+    if not patent_data or not patent_data.patent_number:
+        return None
 
-        # Write the main content
-        f.write(markdown_text)
+    # Use only patent number for filename
+    filename_base = patent_data.patent_number
 
-    print(f"Formatted patent markdown saved to {output_file}")
+    # Save as markdown (save_html_as_markdown creates the folder if needed)
+    md_file = output_path / "markdown" / f"{filename_base}.md"
+
+    # Save HTML as markdown
+    save_html_as_markdown(html_content, str(md_file), soup=soup)
+
+    return patent_data
 
 
 def process_patent_url(
-    args: tuple[str, Path, int, bool],
+    url: str,
+    *,
+    output_path: Path,
+    timeout: int = 30,
+    force_reprocess: bool = False,
+    pool: concurrent.futures.Executor | None = None,
+    refetch: bool = False,
 ) -> tuple[PatentData | None, str | None]:
     """
     Process a single patent URL and save as markdown
 
-    :param args: Tuple containing (url, output_path, timeout, force_reprocess)
+    :param url: Patent URL to process
+    :param output_path: Directory to save the patent files
+    :param timeout: Timeout in seconds for HTTP requests
+    :param force_reprocess: Process the patent even if its file already exists
+    :param pool: Optional process pool for the CPU-bound markdown conversion
+    :param refetch: Download the page even if it is in the HTML cache
     :return: Tuple of (PatentData or None, error message or None)
     """
-    url, output_path, timeout, force_reprocess = args
-
     try:
         # Extract patent ID from URL for preliminary filename check
-        patent_id = url.split("/patent/")[-1].split("/")[0]
+        patent_id = patent_id_from_url(url)
         
-        # Check if file already exists
-        markdown_dir = output_path / "markdown"
-        markdown_dir.mkdir(exist_ok=True, parents=True)
-        md_file = markdown_dir / f"{patent_id}.md"
+        # Check if file already exists; the batch extractors create the folder up front
+        md_file = output_path / "markdown" / f"{patent_id}.md"
         
         if not force_reprocess and md_file.exists():
             print(f"Skipping {url} - file already exists: {md_file}")
             return PatentData(patent_number=patent_id), None
 
-        # Get HTML content
-        html_content = get_html(url, is_url=True)
+        # Get HTML content, from the cache if it was downloaded before
+        cache_file = output_path / "html_cache" / f"{patent_id}.html.gz"
+        html_content = None if refetch else read_html_cache(cache_file)
+        fetched = html_content is None
+        if fetched:
+            html_content = get_html(url, is_url=True, session=get_session())
 
         if not html_content:
             return None, f"Failed to retrieve HTML content for {url}"
 
-        # Extract minimal patent data for reporting
-        patent_data = extract_data(html_content)
+        # Parsing and markdown conversion hold the GIL, so run them in another
+        # process when a pool is given and keep this thread free for fetching
+        if pool is not None:
+            patent_data = pool.submit(html_to_markdown, html_content, output_path).result()
+        else:
+            patent_data = html_to_markdown(html_content, output_path)
 
-        if not patent_data or not patent_data.patent_number:
+        if not patent_data:
             return None, f"Failed to extract patent data from {url}"
 
-        # Use only patent number for filename
-        filename_base = patent_data.patent_number
-
-        # Save as markdown
-        markdown_dir = output_path / "markdown"
-        markdown_dir.mkdir(exist_ok=True, parents=True)
-        md_file = markdown_dir / f"{filename_base}.md"
-        save_html_as_markdown(html_content, str(md_file))
+        # Only cache pages that held a patent, so consent or error pages are
+        # downloaded again on the next run
+        if fetched:
+            write_html_cache(cache_file, html_content)
 
         return patent_data, None
 
     except Exception as e:
-        import traceback
+        return None, format_error(url, e)
+
+
+def read_urls_from_csv(csv_file: str | Path, limit: int | None = None) -> list[str]:
+    """
+    Read patent URLs from a Google Patents CSV export
 
-        trace = traceback.format_exc()
-        return None, f"Error processing {url}: {str(e)}\n{trace}"
+    Only the header and the URL column are parsed; the other export columns are
+    never loaded.
+
+    :param csv_file: Path to CSV file with patent links
+    :param limit: Maximum number of rows to read
+    :return: List of non-empty URLs
+    """
+    # Read only the header - skip the first row which contains the search URL
+    columns = pd.read_csv(csv_file, skiprows=1, nrows=0).columns
+
+    # Check for URL column
+    url_column = next(
+        (col for col in columns if "url" in col.lower() or "link" in col.lower()),
+        None,
+    )
+
+    if not url_column:
+        raise ValueError(
+            "CSV file must have a column containing URLs (with 'url' or 'link' in the name)"
+        )
+
+    # Filter out invalid URLs
+    urls = pd.read_csv(csv_file, skiprows=1, usecols=[url_column], nrows=limit)[
+        url_column
+    ]
+    return [url for url in urls.dropna().tolist() if url]
 
 
 def extract_patents_from_csv(
@@ -324,6 +612,7 @@ def extract_patents_from_csv(
     timeout: int = 30,
     max_workers: int = 10,
     force_reprocess: bool = False,
+    refetch: bool = False,
 ) -> list[PatentData]:
     """
     Extract patents from CSV file containing Google Patent URLs
@@ -334,6 +623,7 @@ def extract_patents_from_csv(
     :param timeout: Timeout in seconds for HTTP requests
     :param max_workers: Maximum number of concurrent workers
     :param force_reprocess: Force reprocessing of patents even if files already exist
+    :param refetch: Download pages again instead of using the HTML cache
     :return: List of extracted PatentData objects
     """
     # Convert to Path objects
@@ -346,50 +636,48 @@ def extract_patents_from_csv(
     # Create a log file for errors
     log_path = output_path / "extraction_errors.log"
 
-    # Read CSV file - skip the first row which contains the search URL
-    df = pd.read_csv(csv_file, skiprows=1)
-
     # Apply limit if specified
     if limit is not None and limit > 0:
-        df = df.head(limit)
         print(f"Limited to processing {limit} patents")
+    else:
+        limit = None
 
-    # Check for URL column
-    url_column = None
-    for col in df.columns:
-        if "url" in col.lower() or "link" in col.lower():
-            url_column = col
-            break
-
-    if not url_column and "result link" in df.columns:
-        url_column = "result link"
-
-    if not url_column:
-        raise ValueError(
-            "CSV file must have a column containing URLs (with 'url' or 'link' in the name)"
-        )
+    urls = read_urls_from_csv(csv_file, limit)
 
-    # Filter out invalid URLs
-    urls = [url for url in df[url_column].tolist() if url and not pd.isna(url)]
+    # Skip patents that already have a markdown file before scheduling any work
+    urls, skipped = skip_processed_urls(urls, output_path, force_reprocess)
 
     # Process patents in parallel
-    patents: list[PatentData] = []
-    success_count = 0
+    patents: list[PatentData] = list(skipped)
+    success_count = len(skipped)
     error_count = 0
 
-    with open(log_path, "w", encoding="utf-8") as log_file:
+    with open(log_path, "w", encoding="utf-8", buffering=65536) as log_file:
         log_file.write(
             f"Patent Extraction Log - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         )
         log_file.write("=" * 80 + "\n\n")
 
-        tasks = [(url, output_path, timeout, force_reprocess) for url in urls]
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Fetch in threads and convert in processes, one per CPU
+        with (
+            concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=_POOL_CONTEXT
+            ) as pool,
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ):
+            # Settings shared by every task are bound once; tasks only get the URL
+            worker = partial(
+                process_patent_url,
+                output_path=output_path,
+                timeout=timeout,
+                force_reprocess=force_reprocess,
+                pool=pool,
+                refetch=refetch,
+            )
             results = list(
                 tqdm(
-                    executor.map(process_patent_url, tasks),
-                    total=len(tasks),
+                    executor.map(worker, urls),
+                    total=len(urls),
                     desc="Processing patents",
                 )
             )
@@ -397,26 +685,45 @@ def extract_patents_from_csv(
             for url, (patent_data, error_msg) in zip(urls, results):
                 if error_msg:
                     log_file.write(f"ERROR - {url}: {error_msg}\n")
-                    print(f"Error: {url}: {error_msg.split('\n')[0]}")
                     error_count += 1
                 else:
                     patents.append(patent_data)
-                    print(f"Saved: {patent_data.patent_number} - {patent_data.title}")
                     success_count += 1
 
         # Write summary
         summary = (
             f"\nExtraction Summary:\n"
-            f"Total URLs: {len(urls)}\n"
+            f"Total URLs: {len(urls) + len(skipped)}\n"
             f"Successfully processed: {success_count}\n"
             f"Errors: {error_count}\n"
         )
         log_file.write(summary)
         print(summary)
+        if error_count:
+            print(f"See {log_path} for error details")
 
     return patents
 
 
+def read_urls_from_txt(txt_file: str | Path) -> list[str]:
+    """
+    Read patent URLs from a text file, one per line
+
+    The file is memory-mapped and split in one go rather than iterated line by
+    line, which matters for very long URL queues.
+
+    :param txt_file: Path to text file with patent URLs
+    :return: List of non-empty, stripped lines
+    """
+    with open(txt_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []  # Empty files cannot be memory-mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, "utf-8")
+
+    return [url for url in map(str.strip, text.splitlines()) if url]
+
+
 def extract_patents_from_txt(
     txt_file: str | Path,
     output_path: str | Path = "output",
@@ -424,6 +731,7 @@ def extract_patents_from_txt(
     timeout: int = 30,
     max_workers: int = 10,
     force_reprocess: bool = False,
+    refetch: bool = False,
 ) -> list[PatentData]:
     """
     Extract patents from a text file containing Google Patent URLs (one per line)
@@ -434,6 +742,7 @@ def extract_patents_from_txt(
     :param timeout: Timeout in seconds for HTTP requests
     :param max_workers: Maximum number of concurrent workers
     :param force_reprocess: Force reprocessing of patents even if files already exist
+    :param refetch: Download pages again instead of using the HTML cache
     :return: List of extracted PatentData objects
     """
     # Convert to Path objects
@@ -446,33 +755,47 @@ def extract_patents_from_txt(
     # Create a log file for errors
     log_path = output_path / "extraction_errors.log"
 
-    # Read text file line by line
-    with open(txt_file, "r", encoding="utf-8") as f:
-        urls = [line.strip() for line in f if line.strip()]
+    urls = read_urls_from_txt(txt_file)
 
     # Apply limit if specified
     if limit is not None and limit > 0:
         urls = urls[:limit]
         print(f"Limited to processing {limit} patents")
 
+    # Skip patents that already have a markdown file before scheduling any work
+    urls, skipped = skip_processed_urls(urls, output_path, force_reprocess)
+
     # Process patents in parallel
-    patents: list[PatentData] = []
-    success_count = 0
+    patents: list[PatentData] = list(skipped)
+    success_count = len(skipped)
     error_count = 0
 
-    with open(log_path, "w", encoding="utf-8") as log_file:
+    with open(log_path, "w", encoding="utf-8", buffering=65536) as log_file:
         log_file.write(
             f"Patent Extraction Log - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
         )
         log_file.write("=" * 80 + "\n\n")
 
-        tasks = [(url, output_path, timeout, force_reprocess) for url in urls]
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Fetch in threads and convert in processes, one per CPU
+        with (
+            concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=_POOL_CONTEXT
+            ) as pool,
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ):
+            # Settings shared by every task are bound once; tasks only get the URL
+            worker = partial(
+                process_patent_url,
+                output_path=output_path,
+                timeout=timeout,
+                force_reprocess=force_reprocess,
+                pool=pool,
+                refetch=refetch,
+            )
             results = list(
                 tqdm(
-                    executor.map(process_patent_url, tasks),
-                    total=len(tasks),
+                    executor.map(worker, urls),
+                    total=len(urls),
                     desc="Processing patents",
                 )
             )
@@ -480,85 +803,95 @@ def extract_patents_from_txt(
             for url, (patent_data, error_msg) in zip(urls, results):
                 if error_msg:
                     log_file.write(f"ERROR - {url}: {error_msg}\n")
-                    print(f"Error: {url}: {error_msg.split('\n')[0]}")
                     error_count += 1
                 else:
                     patents.append(patent_data)
-                    print(f"Saved: {patent_data.patent_number} - {patent_data.title}")
                     success_count += 1
 
         # Write summary
         summary = (
             f"\nExtraction Summary:\n"
-            f"Total URLs: {len(urls)}\n"
+            f"Total URLs: {len(urls) + len(skipped)}\n"
             f"Successfully processed: {success_count}\n"
             f"Errors: {error_count}\n"
         )
         log_file.write(summary)
         print(summary)
+        if error_count:
+            print(f"See {log_path} for error details")
 
     return patents
 
 
 async def process_patent_url_async(
-    url: str, output_path: Path, session: aiohttp.ClientSession, force_reprocess: bool = False
+    url: str,
+    output_path: Path,
+    session: aiohttp.ClientSession,
+    force_reprocess: bool = False,
+    refetch: bool = False,
 ) -> tuple[PatentData | None, str | None]:
     """
     Process a single patent URL asynchronously
     """
     try:
         # Extract patent ID from URL for preliminary filename check
-        patent_id = url.split("/patent/")[-1].split("/")[0]
+        patent_id = patent_id_from_url(url)
         
-        # Check if file already exists
-        markdown_dir = output_path / "markdown"
-        markdown_dir.mkdir(exist_ok=True, parents=True)
-        md_file = markdown_dir / f"{patent_id}.md"
+        # Check if file already exists; the batch extractors create the folder up front
+        md_file = output_path / "markdown" / f"{patent_id}.md"
         
         if not force_reprocess and md_file.exists():
             print(f"Skipping {url} - file already exists: {md_file}")
             return PatentData(patent_number=patent_id), None
 
-        # Get HTML content asynchronously
-        async with session.get(url, timeout=30) as response:
-            if response.status != 200:
-                return (
-                    None,
-                    f"Failed to retrieve HTML content for {url} (Status: {response.status})",
-                )
+        # Use the cached HTML if the page was downloaded before
+        cache_file = output_path / "html_cache" / f"{patent_id}.html.gz"
+        html_content = (
+            None if refetch else await asyncio.to_thread(read_html_cache, cache_file)
+        )
 
-            html_content = await response.text()
+        fetched = html_content is None
+        if fetched:
+            # Get HTML content asynchronously
+            async with session.get(url, timeout=30) as response:
+                if response.status != 200:
+                    return (
+                        None,
+                        f"Failed to retrieve HTML content for {url} (Status: {response.status})",
+                    )
 
-            # Extract minimal patent data for reporting
-            patent_data = extract_data(html_content)
+                html_content = await response.text()
 
-            if not patent_data or not patent_data.patent_number:
-                return None, f"Failed to extract patent data from {url}"
+            if not html_content:
+                return None, f"Failed to retrieve HTML content for {url}"
 
-            # Use only patent number for filename
-            filename_base = patent_data.patent_number
+        # Parse and save in a worker thread so other fetches keep running meanwhile
+        patent_data = await asyncio.to_thread(
+            html_to_markdown, html_content, output_path
+        )
 
-            # Save as markdown
-            markdown_dir = output_path / "markdown"
-            markdown_dir.mkdir(exist_ok=True, parents=True)
-            md_file = markdown_dir / f"{filename_base}.md"
+        if not patent_data:
+            return None, f"Failed to extract patent data from {url}"
 
-            # Save HTML as markdown
-            save_html_as_markdown(html_content, str(md_file))
+        # Only cache pages that held a patent (see process_patent_url)
+        if fetched:
+            await asyncio.to_thread(write_html_cache, cache_file, html_content)
 
-            return patent_data, None
+        return patent_data, None
 
     except asyncio.TimeoutError:
         return None, f"Timeout while processing {url}"
     except Exception as e:
-        import traceback
-
-        trace = traceback.format_exc()
-        return None, f"Error processing {url}: {str(e)}\n{trace}"
+        return None, format_error(url, e)
 
 
 async def extract_patents_async(
-    urls: list[str], output_path: Path, limit: int = None, concurrency: int = 10, force_reprocess: bool = False
+    urls: list[str],
+    output_path: Path,
+    limit: int = None,
+    concurrency: int = 10,
+    force_reprocess: bool = False,
+    refetch: bool = False,
 ) -> list[PatentData]:
     """
     Extract patents asynchronously with controlled concurrency
@@ -572,21 +905,30 @@ async def extract_patents_async(
     output_path.mkdir(exist_ok=True, parents=True)
     log_path = output_path / "extraction_errors.log"
 
+    # Skip patents that already have a markdown file before scheduling any work
+    urls, skipped = skip_processed_urls(urls, output_path, force_reprocess)
+
     # Process patents concurrently with controlled concurrency
-    patents: list[PatentData] = []
-    success_count = 0
+    patents: list[PatentData] = list(skipped)
+    success_count = len(skipped)
     error_count = 0
 
-    # Custom TCP connector with optimized settings
+    # Custom TCP connector with optimized settings. Every URL is on the same host,
+    # so the per-host limit must match the overall concurrency or it becomes the cap;
+    # idle connections are kept open long enough to be reused by the next request
     connector = aiohttp.TCPConnector(
-        limit=concurrency, ttl_dns_cache=300, use_dns_cache=True, limit_per_host=5
+        limit=concurrency,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        limit_per_host=concurrency,
+        keepalive_timeout=60,
     )
 
     # Create shared session for all requests
     async with aiohttp.ClientSession(
         connector=connector, raise_for_status=False
     ) as session:
-        with open(log_path, "w", encoding="utf-8") as log_file:
+        with open(log_path, "w", encoding="utf-8", buffering=65536) as log_file:
             log_file.write(
                 f"Patent Extraction Log - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
             )
@@ -597,7 +939,9 @@ async def extract_patents_async(
 
             async def fetch_with_semaphore(url):
                 async with semaphore:
-                    return await process_patent_url_async(url, output_path, session, force_reprocess)
+                    return await process_patent_url_async(
+                        url, output_path, session, force_reprocess, refetch
+                    )
 
             # Process URLs with progress bar
             tasks = [fetch_with_semaphore(url) for url in urls]
@@ -606,22 +950,22 @@ async def extract_patents_async(
             for url, (patent_data, error_msg) in zip(urls, results):
                 if error_msg:
                     log_file.write(f"ERROR - {url}: {error_msg}\n")
-                    print(f"Error: {url}: {error_msg.split('\n')[0]}")
                     error_count += 1
                 else:
                     patents.append(patent_data)
-                    print(f"Saved: {patent_data.patent_number} - {patent_data.title}")
                     success_count += 1
 
             # Write summary
             summary = (
                 f"\nExtraction Summary:\n"
-                f"Total URLs: {len(urls)}\n"
+                f"Total URLs: {len(urls) + len(skipped)}\n"
                 f"Successfully processed: {success_count}\n"
                 f"Errors: {error_count}\n"
             )
             log_file.write(summary)
             print(summary)
+            if error_count:
+                print(f"See {log_path} for error details")
 
     return patents
 
@@ -684,11 +1028,24 @@ async def main_async():
         action="store_true",
         help="Force reprocessing of patents even if files already exist",
     )
+    parser.add_argument(
+        "--refetch",
+        action="store_true",
+        help="Download patent pages again instead of using the cached HTML",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Include full tracebacks for failed patents in the error log",
+    )
 
     args = parser.parse_args()
 
     start_time = time.time()
 
+    global INCLUDE_TRACEBACKS
+    INCLUDE_TRACEBACKS = args.debug
+
     try:
         # Update request parameters and set the global timeout
         requests.adapters.DEFAULT_RETRIES = args.retry
@@ -702,8 +1059,17 @@ async def main_async():
 
         # Handle single URL case first
         if args.url:
+            # process_patent_url(_async) skips patents whose markdown already exists
+            md_file = output_dir / "markdown" / f"{patent_id_from_url(args.url)}.md"
+            skipped = not args.force and md_file.exists()
             if args.sync:
-                patent, error = process_patent_url((args.url, output_dir, args.timeout, args.force))
+                patent, error = process_patent_url(
+                    args.url,
+                    output_path=output_dir,
+                    timeout=args.timeout,
+                    force_reprocess=args.force,
+                    refetch=args.refetch,
+                )
                 if error:
                     print(f"Error: {error}")
                     return 1
@@ -713,13 +1079,18 @@ async def main_async():
                 connector = aiohttp.TCPConnector(limit=1, ttl_dns_cache=300)
                 async with aiohttp.ClientSession(connector=connector) as session:
                     patent, error = await process_patent_url_async(
-                        args.url, output_dir, session, args.force
+                        args.url, output_dir, session, args.force, args.refetch
                     )
                     if error:
                         print(f"Error: {error}")
                         return 1
                     print(f"Processed patent: {patent.patent_number} - {patent.title}")
 
+            # Only the single-URL run reports the file; batch runs print a summary
+            if not skipped:
+                md_file = output_dir / "markdown" / f"{patent.patent_number}.md"
+                print(f"Formatted patent markdown saved to {md_file}")
+
         # Handle CSV input
         elif args.csv:
             if args.sync:
@@ -731,33 +1102,20 @@ async def main_async():
                     timeout=args.timeout,
                     max_workers=args.workers,
                     force_reprocess=args.force,
+                    refetch=args.refetch,
                 )
             else:
                 # Process asynchronously
-                # Read CSV file - skip the first row
-                df = pd.read_csv(args.csv, skiprows=1)
-
-                # Find URL column
-                url_column = next(
-                    (
-                        col
-                        for col in df.columns
-                        if "url" in col.lower() or "link" in col.lower()
-                    ),
-                    "result link",
-                )
-
-                if url_column not in df.columns:
-                    raise ValueError("CSV file must have a column containing URLs")
-
-                # Filter valid URLs
-                urls = [
-                    url for url in df[url_column].tolist() if url and not pd.isna(url)
-                ]
+                urls = read_urls_from_csv(args.csv)
 
                 # Process asynchronously
                 patents = await extract_patents_async(
-                    urls, output_dir, limit=args.limit, concurrency=args.concurrency, force_reprocess=args.force
+                    urls,
+                    output_dir,
+                    limit=args.limit,
+                    concurrency=args.concurrency,
+                    force_reprocess=args.force,
+                    refetch=args.refetch,
                 )
 
         # Handle TXT input
@@ -771,15 +1129,19 @@ async def main_async():
                     timeout=args.timeout,
                     max_workers=args.workers,
                     force_reprocess=args.force,
+                    refetch=args.refetch,
                 )
             else:
-                # Read text file
-                with open(args.txt, "r", encoding="utf-8") as f:
-                    urls = [line.strip() for line in f if line.strip()]
+                urls = read_urls_from_txt(args.txt)
 
                 # Process asynchronously
                 patents = await extract_patents_async(
-                    urls, output_dir, limit=args.limit, concurrency=args.concurrency, force_reprocess=args.force
+                    urls,
+                    output_dir,
+                    limit=args.limit,
+                    concurrency=args.concurrency,
+                    force_reprocess=args.force,
+                    refetch=args.refetch,
                 )
 
         # Calculate performance
@@ -796,8 +1158,6 @@ async def main_async():
 
     except Exception as e:
         print(f"Error: {e}")
-        import traceback
-
         traceback.print_exc()
         return 1
 
@@ -815,7 +1175,15 @@ def main():
         print("This script requires Python 3.7 or higher")
         return 1
 
-    return asyncio.run(main_async())
+    # Use the libuv-based event loop when available (not supported on Windows)
+    try:
+        import uvloop
+
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+
+    return asyncio.run(main_async(), loop_factory=loop_factory)
 
 
 if __name__ == "__main__":
@@ -1,85 +1,161 @@
 import yaml
 from pathlib import Path
 import argparse
+import concurrent.futures
+import csv
+import os
+from collections import deque
 import re
-import pandas as pd
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Union
+
+try:
+    # libyaml's C parser is much faster than the pure-Python loader
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# Patent publication numbers such as US10000000B2
+_PATENT_NUMBER_RE = re.compile(r"^[A-Z]{2}\d+[A-Z]?\d*$")
+
+GOOGLE_PATENT_URL = "https://patents.google.com/patent/{}/en"
+
+# Pre-split paths for get_nested_value lookups done once per patent
+PATENT_NUMBER_PATH = ("bibliographic_information", "patent_number")
+FORWARD_CITATIONS_PATH = ("citation_information", "list_of_forward_citations")
+
+# Analysis files parsed per worker task, to amortize sending work to a process
+FOLDER_BATCH_SIZE = 16
 
 
 def extract_analysis_from_yaml(yaml_path: Path) -> dict:
-    with open(yaml_path, "r") as f:
-        data = yaml.safe_load(f)
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=YamlLoader)
     return data
 
 
+def _extract_batch(yaml_paths: List[Path]) -> List[Any]:
+    return [extract_analysis_from_yaml(yaml_path) for yaml_path in yaml_paths]
+
+
+def iter_folder(folder_path: Path) -> Iterator[tuple[str, Any]]:
+    """
+    Parse the analysis files in a folder, yielding them one at a time.
+
+    Files are parsed in batches on a process pool, with at most two batches per
+    worker in flight. Memory use is bounded by those batches, not by the folder.
+
+    :param folder_path: Folder containing the .yaml analysis files
+    :return: Iterator of (file stem, parsed data) pairs
+    """
+    files = list(folder_path.glob("*.yaml"))
+    batches = iter(
+        [files[i : i + FOLDER_BATCH_SIZE] for i in range(0, len(files), FOLDER_BATCH_SIZE)]
+    )
+    max_pending = 2 * (os.cpu_count() or 1)
+
+    # Parsing is CPU-bound and every file is independent, so spread it over processes
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        pending = deque()
+        while True:
+            # Top up the work in flight, then hand out the oldest batch in file order
+            while len(pending) < max_pending and (batch := next(batches, None)):
+                pending.append((batch, executor.submit(_extract_batch, batch)))
+            if not pending:
+                break
+            batch, future = pending.popleft()
+            for file, data in zip(batch, future.result()):
+                yield file.stem, data
+
+
 def extract_from_folder(folder_path: Path) -> dict:
-    results = {}
-    for file in folder_path.glob("*.yaml"):
-        results[file.stem] = extract_analysis_from_yaml(file)
-    return results
+    return dict(iter_folder(folder_path))
 
 
-def get_nested_value(data: dict, path: str):
+def get_nested_value(data: dict, path: Union[str, tuple[str, ...]]):
     """
     Extract a value from a nested dictionary using dot notation path.
     Example: "bibliographic_information.patent_number"
     
     :param data: Dictionary to extract from
-    :param path: Dot-separated path to the value
+    :param path: Dot-separated path to the value, or the path already split into keys
     :return: The value if found, None otherwise
     """
-    keys = path.split('.')
+    keys = path.split('.') if isinstance(path, str) else path
     current = data
-    
-    for key in keys:
-        if isinstance(current, dict) and key in current:
+
+    # Plain indexing; a missing key or a non-dict level raises instead of being
+    # checked at every step
+    try:
+        for key in keys:
             current = current[key]
-        else:
-            return None
-    
+    except (KeyError, TypeError):
+        return None
+
     return current
 
 
 def output_query_results(results: dict, key_to_query: str):
     query_results = {}
+    # Split the paths once rather than on every lookup
+    query_path = tuple(key_to_query.split('.'))
     for file_name, result in results.items():
-        value = get_nested_value(result, key_to_query)
+        value = get_nested_value(result, query_path)
         if value is not None:
-            patent_number = get_nested_value(result, "bibliographic_information.patent_number") or "Unknown"
+            patent_number = get_nested_value(result, PATENT_NUMBER_PATH) or "Unknown"
             query_results[patent_number] = value
     return query_results
 
 
 def extract_patent_numbers(items: List[str]) -> List[str]:
-    patent_pattern = r"^[A-Z]{2}\d+[A-Z]?\d*$"
-    return [item.strip() for item in items if re.match(patent_pattern, item.strip())]
+    return [item for item in map(str.strip, items) if _PATENT_NUMBER_RE.match(item)]
 
 
 def add_google_patent_urls(patent_numbers: List[str]) -> List[str]:
-    base_url = "https://patents.google.com/patent/"
-    return [f"{base_url}{patent_number}/en" for patent_number in patent_numbers]
+    return [GOOGLE_PATENT_URL.format(patent_number) for patent_number in patent_numbers]
 
 
-def output_url_to_file(urls: List[str], output_file: Path):
+def output_url_to_file(urls: Iterable[str], output_file: Path):
     with open(output_file, "w") as f:
-        for url in urls:
-            f.write(url + "\n")
+        # One write for the whole list instead of one per URL
+        f.write("".join(f"{url}\n" for url in urls))
+
+
+def _arrow_safe_column(values: List[Any]) -> List[Any]:
+    """
+    Make a column writable by Arrow, which needs a single type per column.
+
+    The LLM-generated YAML can mix types within a field (e.g. "12" and 12, or
+    strings and dicts in a list), so such columns are written as strings.
+
+    :param values: Column values, None for empty cells
+    :return: The values unchanged if they share one scalar type, else as strings
+    """
+    value_types = {type(value) for value in values if value is not None}
+    if len(value_types) <= 1 and not value_types & {dict, list}:
+        return values
+    return [None if value is None else str(value) for value in values]
 
 
 def extract_to_csv(
-    results: Dict[str, Any], keys_to_extract: List[str], output_file: Path
+    results: Union[Dict[str, Any], Iterable[tuple[str, Any]]],
+    keys_to_extract: List[str],
+    output_file: Path,
 ) -> None:
     """
     Extract specified keys from patent results and output to CSV.
+    An output_file ending in .parquet or .feather is written in that columnar format
+    instead (requires pyarrow).
     For list values, output as separate columns (key (1), key (2), etc.) up to 5 items max.
     Always includes patent_number, google_patent_url, title, and assignee as the first columns.
     Preserves the order of input keys. Supports nested fields using dot notation.
 
-    :param results: Dictionary of patent results, keyed by filename
+    :param results: Dictionary of patent results keyed by filename, or an iterable of
+        (filename, result) pairs such as iter_folder(), which is consumed in one pass
     :param keys_to_extract: List of keys to extract from each patent (can use dot notation)
     :param output_file: Path to save the CSV output
     """
-    # Standard columns that always appear first with their nested paths
+    # Standard columns that always appear first; all but the URL are read from
+    # the bibliographic_information section
     standard_columns = [
         "patent_number", 
         "google_patent_url", 
@@ -87,12 +163,6 @@ def extract_to_csv(
         "assignee"
     ]
     
-    standard_paths = {
-        "patent_number": "bibliographic_information.patent_number",
-        "title": "bibliographic_information.title",
-        "assignee": "bibliographic_information.assignee"
-    }
-    
     # Preserve the order of input keys, excluding standard columns
     filtered_keys = []
     for k in keys_to_extract:
@@ -101,85 +171,85 @@ def extract_to_csv(
         if display_name not in standard_columns and k not in filtered_keys:
             filtered_keys.append(k)
 
+    # Split every path once up front: (split path, display name) per key
+    key_paths = []
+    for k in filtered_keys:
+        path = tuple(k.split('.'))
+        key_paths.append((path, path[-1]))
+
     # Initialize a dictionary to track max items in each list field (capped at 5)
     max_list_lengths = {}
     
     # Track which keys are lists
     list_keys = set()
 
-    # First pass: determine the maximum number of items for each list field (up to 5)
-    for _, result in results.items():
-        for key in filtered_keys:
-            value = get_nested_value(result, key)
-            if value is not None and isinstance(value, list):
-                display_name = key.split('.')[-1]
-                list_keys.add(display_name)
-                current_length = min(len(value), 5)  # Cap at 5 items
-                if display_name not in max_list_lengths or current_length > max_list_lengths[display_name]:
-                    max_list_lengths[display_name] = current_length
+    # Build the table column by column (one list entry per patent) in a single pass.
+    # Results may be streamed, so the row count is not known up front: columns grow
+    # as rows arrive, columns first seen at a later row are back-filled with None,
+    # and columns a row does not set are padded with None at the end.
+    columns: Dict[str, List[Any]] = {name: [] for name in standard_columns}
+
+    def set_cell(column_name: str, value: Any) -> None:
+        column = columns.setdefault(column_name, [])
+        if len(column) < row:
+            column.extend([None] * (row - len(column)))
+        if len(column) == row:
+            column.append(value)
+        else:
+            # Several keys share this display name; the last one wins
+            column[row] = value
 
-    # Create a list to hold the data
-    data = []
+    if isinstance(results, dict):
+        results = results.items()
 
     # Process each result
-    for file_name, result in results.items():
-        # Get patent number and generate Google patent URL
-        patent_number = get_nested_value(result, "bibliographic_information.patent_number") or "Unknown"
-        google_url = f"https://patents.google.com/patent/{patent_number}/en"
-
-        # Create a dict for this patent with standard columns
-        patent_data = {
-            "patent_number": patent_number,
-            "google_patent_url": google_url,
-            "title": get_nested_value(result, "bibliographic_information.title") or "Unknown",
-            "assignee": get_nested_value(result, "bibliographic_information.assignee") or "Unknown",
-        }
+    for row, (_, result) in enumerate(results):
+        # Resolve the shared section once for the standard columns
+        bib = get_nested_value(result, ("bibliographic_information",))
+        if not isinstance(bib, dict):
+            bib = {}
+
+        columns["patent_number"].append(bib.get("patent_number") or "Unknown")
+        columns["title"].append(bib.get("title") or "Unknown")
+        columns["assignee"].append(bib.get("assignee") or "Unknown")
 
         # Extract each requested key
-        for key in filtered_keys:
-            value = get_nested_value(result, key)
-            display_name = key.split('.')[-1]
-            
-            if value is not None:
-                # Handle special cases like nested dictionaries or lists
-                if isinstance(value, dict):
-                    # Flatten the dictionary into separate columns
-                    for subkey, subvalue in value.items():
-                        patent_data[f"{display_name}_{subkey}"] = subvalue
-                elif isinstance(value, list):
-                    # Only use up to 5 items from the list
-                    limited_value = value[:5]
-                    
-                    # Create a separate column for each list item (up to 5)
-                    for i, item in enumerate(limited_value, 1):
-                        patent_data[f"{display_name} ({i})"] = item
-                    
-                    # Fill in empty columns for missing items to ensure consistent columns
-                    if display_name in max_list_lengths:
-                        for i in range(len(limited_value) + 1, max_list_lengths[display_name] + 1):
-                            patent_data[f"{display_name} ({i})"] = None
-                else:
-                    patent_data[display_name] = value
+        for path, display_name in key_paths:
+            value = get_nested_value(result, path)
+
+            # Handle special cases like nested dictionaries or lists
+            if isinstance(value, dict):
+                # Flatten the dictionary into separate columns
+                for subkey, subvalue in value.items():
+                    set_cell(f"{display_name}_{subkey}", subvalue)
+            elif isinstance(value, list):
+                # Only use up to 5 items from the list
+                limited_value = value[:5]
+                list_keys.add(display_name)
+                max_list_lengths[display_name] = max(
+                    max_list_lengths.get(display_name, 0), len(limited_value)
+                )
+
+                # Create a separate column for each list item (up to 5)
+                for i, item in enumerate(limited_value, 1):
+                    set_cell(f"{display_name} ({i})", item)
             else:
-                # For non-list keys, add None
-                if display_name not in list_keys:
-                    patent_data[display_name] = None
-                else:
-                    # For list keys, add numbered None values
-                    for i in range(1, max_list_lengths.get(display_name, 0) + 1):
-                        patent_data[f"{display_name} ({i})"] = None
-
-        data.append(patent_data)
-
-    # Convert to DataFrame and save to CSV
-    df = pd.DataFrame(data)
-    
+                # Plain values, and None for missing keys
+                set_cell(display_name, value)
+
+    # Pad columns that the last rows did not set
+    row_count = len(columns["patent_number"])
+    for column in columns.values():
+        column.extend([None] * (row_count - len(column)))
+
+    # Generate the Google patent URLs for the whole column at once
+    columns["google_patent_url"] = list(map(GOOGLE_PATENT_URL.format, columns["patent_number"]))
+
     # Build the list of columns in the correct order
     ordered_columns = standard_columns.copy()
     
     # Add remaining columns in the order of filtered_keys
-    for key in filtered_keys:
-        display_name = key.split('.')[-1]
+    for _, display_name in key_paths:
         if display_name in list_keys:
             # For list keys, add the numbered columns only
             for i in range(1, max_list_lengths.get(display_name, 0) + 1):
@@ -188,20 +258,42 @@ def extract_to_csv(
             # For non-list keys, add the key directly
             ordered_columns.append(display_name)
 
-    # Only include columns that exist in the DataFrame
-    final_columns = [col for col in ordered_columns if col in df.columns]
-    
-    # Reorder the DataFrame columns
-    df = df[final_columns]
-    
-    df.to_csv(output_file, index=False)
+    # Only include columns that exist in the table
+    final_columns = [col for col in ordered_columns if col in columns]
+
+    output_format = Path(output_file).suffix.lower()
+    if output_format in (".parquet", ".feather"):
+        # Only needed for the columnar formats, so CSV runs don't pay the import
+        import pandas as pd
+
+        # Binary columnar output for analysis pipelines, written by Arrow
+        df = pd.DataFrame(
+            {col: _arrow_safe_column(columns[col]) for col in final_columns}
+        )
+        if output_format == ".parquet":
+            df.to_parquet(output_file, index=False, compression="zstd")
+        else:
+            df.to_feather(output_file)
+        print(f"Data extracted and saved to {output_file}")
+        return
+
+    # The columns are plain lists already, so write the rows directly with the
+    # C csv writer instead of going through a DataFrame
+    with open(output_file, "w", encoding="utf-8", newline="") as f:
+        # Match pandas' to_csv, which ends rows with the platform line separator
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(final_columns)
+        writer.writerows(zip(*(columns[col] for col in final_columns)))
     print(f"Data extracted and saved to {output_file}")
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_dir", type=Path, required=True)
-    parser.add_argument("--output_file", type=Path, required=False)
+    parser.add_argument(
+        "--output_file", type=Path, required=False,
+        help="Output file (.csv, or .parquet/.feather for columnar output)",
+    )
     parser.add_argument(
         "--keys", nargs="+", help="Keys to extract from patent data (can use dot notation like 'bibliographic_information.inventors')", required=False
     )
@@ -212,7 +304,8 @@ def main():
     else:
         output_file = args.input_dir / "patent_data.csv"
 
-    results = extract_from_folder(args.input_dir)
+    # Stream the analysis files; neither branch needs them all in memory at once
+    results = iter_folder(args.input_dir)
 
     if args.keys:
         # Always include standard columns while preserving order of user-specified keys
@@ -237,15 +330,15 @@ def main():
     else:
         # Default behavior - output patent URLs from citation information
         cited_patents = []
-        for _, result in results.items():
-            citations = get_nested_value(result, "citation_information.list_of_forward_citations")
+        for _, result in results:
+            citations = get_nested_value(result, FORWARD_CITATIONS_PATH)
             if citations:
                 cited_patents.extend(citations)
 
         patent_numbers = extract_patent_numbers(cited_patents)
-        urls = add_google_patent_urls(patent_numbers)
         url_output_file = args.input_dir / "cited_by_urls.txt"
-        output_url_to_file(urls, url_output_file)
+        # Format the URLs as they are written instead of building a list first
+        output_url_to_file(map(GOOGLE_PATENT_URL.format, patent_numbers), url_output_file)
 
 
 if __name__ == "__main__":